@@ -5,81 +5,99 @@ Cleans CDBG application data for 2022-2026 analysis
 import pandas as pd
 import numpy as np
 import re
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
 from pathlib import Path
 
 # Configuration
 DATA_FILE = Path("data/2022-2026 Case Data.xlsx")
 OUTPUT_DIR = Path("hw3_output")
 OUTPUT_DIR.mkdir(exist_ok=True)
+HEADER_SEARCH_ROWS = 20  # Header row is always within the first rows of a sheet
+YEAR_RE = re.compile(r"(20\d{2})")
+SUMMARY_ROW_RE = re.compile(r"total|subtotal|available|cap|estimated", re.IGNORECASE)
+NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"  # Text accepted by to_number
 
 pd.set_option("display.max_columns", 200)
 pd.set_option("display.width", 200)
 
 
 # Helper Functions
-def to_number(value):
-    """Convert string to numeric, handling currency symbols and commas"""
-    if pd.isna(value):
-        return np.nan
-    s = str(value).replace(",", "").replace("$", "").strip()
-    try:
-        return float(s)
-    except:
-        return np.nan
+def to_number(values):
+    """Convert a Series to numeric, handling currency symbols and commas"""
+    numbers = pd.to_numeric(values, errors="coerce")
+    # Only text cells need cleaning; numeric cells are kept exactly as read
+    text = pc.utf8_trim_whitespace(
+        pc.replace_substring_regex(pa.array(values.astype(str)), r"[,$]", ""))
+    # Arrow's cast raises on bad text, so null out anything that isn't a number first
+    text = pc.if_else(pc.match_substring_regex(text, NUMBER_PATTERN), text, None)
+    parsed = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+    return numbers.fillna(pd.Series(parsed, index=values.index)).astype(float)
 
 
 def extract_year(text):
     """Extract first year from text (e.g., '2022-2023' -> 2022)"""
-    match = re.search(r"(20\d{2})", str(text))
+    match = YEAR_RE.search(str(text))
     return int(match.group(1)) if match else np.nan
 
 
-def classify_app_type(text):
-    """Classify application into standard categories"""
-    s = str(text).strip().lower()
-    if "social" in s or s == "ss":
-        return "Social Services"
-    if any(x in s for x in ["con", "dev", "econ"]):
-        return "Construction/Development"
-    if "admin" in s or s == "ap":
-        return "Admin"
-    if "planning" in s:
-        return "Planning"
-    return "Other"
+def classify_app_type(values):
+    """Classify applications in a Series into standard categories"""
+    s = values.astype(str).str.strip().str.lower()
+    conditions = [
+        s.str.contains("social", na=False) | (s == "ss"),
+        s.str.contains("con|dev|econ", regex=True, na=False),
+        s.str.contains("admin", na=False) | (s == "ap"),
+        s.str.contains("planning", na=False),
+    ]
+    choices = ["Social Services", "Construction/Development", "Admin", "Planning"]
+    return np.select(conditions, choices, default="Other")
 
 
-def classify_priority(text):
-    """Map priority to standard categories (ANGHP, EO, NI, HA)"""
-    s = str(text).strip().upper()
-    if s in ("NAN", "NONE", "", "ALL"):
-        return "Unknown"
-    if "HOMELESS" in s or "ANGHP" in s:
-        return "ANGHP"  # Addressing Needs of Growing Homeless Population
-    if "ECONOMIC" in s or "EO" in s:
-        return "EO"  # Economic Opportunity
-    if "NEIGHBORHOOD" in s or "NI" in s:
-        return "NI"  # Neighborhood Investment and Infrastructure
-    if "HOUSING" in s or "HA" in s:
-        return "HA"  # Housing Availability
-    return "Other"
+def classify_priority(values):
+    """Map priorities in a Series to standard categories (ANGHP, EO, NI, HA)"""
+    s = values.astype(str).str.strip().str.upper()
+    conditions = [
+        values.isna() | s.isin(["NAN", "NONE", "", "ALL"]),
+        s.str.contains("HOMELESS|ANGHP", regex=True, na=False),  # Addressing Needs of Growing Homeless Population
+        s.str.contains("ECONOMIC|EO", regex=True, na=False),     # Economic Opportunity
+        s.str.contains("NEIGHBORHOOD|NI", regex=True, na=False), # Neighborhood Investment and Infrastructure
+        s.str.contains("HOUSING|HA", regex=True, na=False),      # Housing Availability
+    ]
+    choices = ["Unknown", "ANGHP", "EO", "NI", "HA"]
+    return np.select(conditions, choices, default="Other")
 
 
 def is_summary_row(org):
-    """Check if row is a summary/total row (not actual application data)"""
-    if pd.isna(org):
-        return True
-    s = str(org).lower()
-    return bool(re.search(r"total|subtotal|available|cap|estimated", s))
+    """Flag summary/total rows (not actual application data) in an org Series"""
+    return org.isna() | org.astype(str).str.contains(SUMMARY_ROW_RE, na=True)
+
+
+def read_rows(ws):
+    """Read worksheet rows as lists, trimming trailing empty cells/rows like pandas"""
+    rows = []
+    for row in ws.iter_rows(values_only=True):
+        row = list(row)
+        while row and row[-1] in (None, ""):
+            row.pop()
+        rows.append(row)
+    while rows and not rows[-1]:
+        rows.pop()
+    width = max((len(r) for r in rows), default=0)
+    return [r + [None] * (width - len(r)) for r in rows]
 
 
 # Main Processing Function
-def clean_sheet(sheet_name, file_path):
+def clean_sheet(sheet_name, ws):
     """
     Clean a single worksheet from the Excel file
     
     Args:
         sheet_name: Name of the worksheet
-        file_path: Path to Excel file
+        ws: openpyxl worksheet (read-only) for that sheet
         
     Returns:
         DataFrame with cleaned data
@@ -89,35 +107,38 @@ def clean_sheet(sheet_name, file_path):
     print(f"{'='*70}")
     
     # Step 1: Determine header row location
+    # The sheet is streamed once; the header probe reuses those rows
+    rows = read_rows(ws)
     # 2022-23 and 2023-24 use row 2, 2024-25/2025-26 need to search
     if any(yr in sheet_name for yr in ["2022", "2023"]):
         header = 2
     else:
         # Search for row containing "Organization" or "Case Id"
-        df_temp = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-        header = next((i for i in range(20) if 
-                      "organization" in str(df_temp.iloc[i]).lower()), 8)
+        header = next((i for i, row in enumerate(rows[:HEADER_SEARCH_ROWS]) if 
+                      "organization" in str(row).lower()), 8)
     
-    # Step 2: Read data with identified header
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=header)
+    # Step 2: Build data frame with identified header
+    names = [c if c is not None else f"Unnamed: {i}" for i, c in enumerate(rows[header])]
+    df = pd.DataFrame(rows[header + 1:], columns=names)
     df = df.dropna(how="all")  # Remove completely empty rows
     year = extract_year(sheet_name)
     
     cols = df.columns
+    lc = [str(c).lower() for c in cols]  # Lowercased once for all keyword searches
     print(f"Columns: {len(cols)}")
     
     # Step 3: Identify key columns by searching for keywords
     col_idx = {
-        "Type": next((i for i, c in enumerate(cols) if "type" in str(c).lower()), 1),
-        "Priority": next((i for i, c in enumerate(cols) if 
-                         "priority" in str(c).lower() and "impact" not in str(c).lower()), 2),
-        "Org": next((i for i, c in enumerate(cols) if "organization" in str(c).lower()), 3),
-        "Project": next((i for i, c in enumerate(cols) if 
-                        "project" in str(c).lower() or "program" in str(c).lower()), 4),
-        "Request": next((i for i, c in enumerate(cols) if "request" in str(c).lower()), 5),
+        "Type": next((i for i, c in enumerate(lc) if "type" in c), 1),
+        "Priority": next((i for i, c in enumerate(lc) if 
+                         "priority" in c and "impact" not in c), 2),
+        "Org": next((i for i, c in enumerate(lc) if "organization" in c), 3),
+        "Project": next((i for i, c in enumerate(lc) if 
+                        "project" in c or "program" in c), 4),
+        "Request": next((i for i, c in enumerate(lc) if "request" in c), 5),
         "Award": len(cols) - 1,  # Last column is typically award
-        "Total_Score": next((i for i, c in enumerate(cols) if 
-                            "avg" in str(c).lower() and "score" in str(c).lower()), 
+        "Total_Score": next((i for i, c in enumerate(lc) if 
+                            "avg" in c and "score" in c), 
                            12 if len(cols) > 12 else None)
     }
     
@@ -131,8 +152,7 @@ def clean_sheet(sheet_name, file_path):
     }
     
     # Method 1: Search by column name (works for 2024-25 and 2025-26)
-    for i, col in enumerate(cols):
-        col_lower = str(col).lower()
+    for i, col_lower in enumerate(lc):
         if "priority" in col_lower and "impact" in col_lower:
             score_breakdown["Score_Impact"] = i
         elif "guiding" in col_lower and "principle" in col_lower:
@@ -146,7 +166,7 @@ def clean_sheet(sheet_name, file_path):
     # These years use column headers like "30 pts", "30 pts", "25 pts", "15 pts"
     if any(yr in sheet_name for yr in ["2022", "2023"]):
         pts_cols = [(i, str(col)) for i, col in enumerate(cols) 
-                    if "pt" in str(col).lower()]
+                    if "pt" in lc[i]]
         
         if len(pts_cols) >= 4:
             # Scoring order: Impact(30), Principles(30), Capacity(25), Collab(15)
@@ -160,37 +180,36 @@ def clean_sheet(sheet_name, file_path):
         col_name = cols[idx] if idx is not None else "Not found"
         print(f"  {key}: {col_name}")
     
-    # Step 5: Extract and clean data
-    records = []
-    for _, row in df.iterrows():
-        org = row.iloc[col_idx["Org"]]
-        
-        # Skip summary/total rows
-        if is_summary_row(org):
-            continue
-        
-        # Extract all fields
-        record = {
-            "Year": year,
-            "Organization": str(org).strip(),
-            "Project": row.iloc[col_idx["Project"]],
-            "Type": row.iloc[col_idx["Type"]],
-            "Priority": row.iloc[col_idx["Priority"]],
-            "Funding_Request": to_number(row.iloc[col_idx["Request"]]),
-            "Funding_Award": to_number(row.iloc[col_idx["Award"]]),
-            "Total_Score": to_number(row.iloc[col_idx["Total_Score"]]) if col_idx["Total_Score"] else np.nan,
-        }
-        
-        # Add scoring breakdown (required for "breakdown of scoring sections")
-        for key, idx in score_breakdown.items():
-            record[key] = to_number(row.iloc[idx]) if idx is not None else np.nan
-        
-        records.append(record)
+    # Step 5: Extract and clean data (column-wise, no per-row iteration)
+    # Skip summary/total rows
+    keep = ~is_summary_row(df.iloc[:, col_idx["Org"]])
+    sub = df.loc[keep]
+    
+    def column(idx):
+        """Numeric column at position idx, or all-NaN if not identified"""
+        if idx is None:
+            return pd.Series(np.nan, index=sub.index)
+        return to_number(sub.iloc[:, idx])
+    
+    data = {
+        "Year": year,
+        "Organization": sub.iloc[:, col_idx["Org"]].astype(str).str.strip(),
+        "Project": sub.iloc[:, col_idx["Project"]],
+        "Type": sub.iloc[:, col_idx["Type"]],
+        "Priority": sub.iloc[:, col_idx["Priority"]],
+        "Funding_Request": column(col_idx["Request"]),
+        "Funding_Award": column(col_idx["Award"]),
+        "Total_Score": column(col_idx["Total_Score"]),
+    }
+    
+    # Add scoring breakdown (required for "breakdown of scoring sections")
+    for key, idx in score_breakdown.items():
+        data[key] = column(idx)
     
     # Step 6: Create DataFrame and apply classifications
-    result = pd.DataFrame(records)
-    result["App_Type"] = result["Type"].apply(classify_app_type)
-    result["Priority_Category"] = result["Priority"].apply(classify_priority)
+    result = pd.DataFrame(data, index=sub.index).reset_index(drop=True)
+    result["App_Type"] = classify_app_type(result["Type"])
+    result["Priority_Category"] = classify_priority(result["Priority"])
     
     print(f"Extracted {len(result)} records")
     print(f"  By category: {result['App_Type'].value_counts().to_dict()}")
@@ -211,9 +230,12 @@ def main():
     print("HW3 DATA CLEANING - CDBG Applications 2022-2026")
     print("="*70)
     
-    # Process all worksheets
-    xlsx = pd.ExcelFile(DATA_FILE)
-    all_data = [clean_sheet(sheet, DATA_FILE) for sheet in xlsx.sheet_names]
+    # Process all worksheets (workbook is opened once, in streaming mode)
+    wb = load_workbook(DATA_FILE, read_only=True, data_only=True)
+    try:
+        all_data = [clean_sheet(sheet, wb[sheet]) for sheet in wb.sheetnames]
+    finally:
+        wb.close()
     
     # Combine all years
     combined = pd.concat(all_data, ignore_index=True)
@@ -252,10 +274,16 @@ def main():
     print(f"\nMissing Awards: {combined['Funding_Award'].isna().sum()}")
     
     # Save cleaned data
+    # Convert to Arrow once; the CSV and Parquet writers both use the table
     output_file = OUTPUT_DIR / "cleaned_data_2022_2026.csv"
-    combined.to_csv(output_file, index=False)
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    pacsv.write_csv(table, output_file)
+    # Typed binary copy for the analysis script (no re-parsing on load)
+    parquet_file = output_file.with_suffix(".parquet")
+    pq.write_table(table, parquet_file)
     
     print(f"\n✓ Data saved to: {output_file}")
+    print(f"✓ Data saved to: {parquet_file}")
     print(f"\nColumns in output: {list(combined.columns)}")
     print("="*70)
     
@@ -3,22 +3,27 @@ Final Complete Analysis
 Automatically detects column names and generates all report assets
 
 Output:
-- Charts: output/report_assets/charts/ (5 PNG files)
+- Charts: output/report_assets/charts/ (5 files in FIG_FORMAT, PNG by default)
 - Tables: output/report_assets/tables/ (8 CSV files)
 """
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # File output only; skip GUI backend probing
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 import sys
+import io
+import os
 
 # ============================================================================
 # Configuration
 # ============================================================================
-# Try multiple possible file names
-POSSIBLE_DATA_FILES = [Path("hw3_output/cleaned_data_2022_2026.csv")]
+# Try multiple possible file names (Parquet preferred, CSV as fallback)
+POSSIBLE_DATA_FILES = [Path("hw3_output/cleaned_data_2022_2026.parquet"),
+                       Path("hw3_output/cleaned_data_2022_2026.csv")]
 
 DATA_FILE = None
 for path in POSSIBLE_DATA_FILES:
@@ -43,6 +48,31 @@ TABLES_DIR.mkdir(parents=True, exist_ok=True)
 sns.set_style("whitegrid")
 plt.rcParams['font.size'] = 11
 
+# Shared export settings for every chart (150 dpi is ample for slides)
+# Fast PNG deflate by default; set FIG_COMPRESS_LEVEL=6-9 for smaller final files
+FIG_COMPRESS_LEVEL = int(os.getenv('FIG_COMPRESS_LEVEL', '1'))
+# FIG_FORMAT=svg writes vector charts instead (no pixel buffer to rasterize or deflate)
+FIG_FORMAT = os.getenv('FIG_FORMAT', 'png')
+FIG_FORMATS = ('png', 'svg', 'pdf')
+if FIG_FORMAT not in FIG_FORMATS:
+    print(f"ERROR: FIG_FORMAT must be one of {', '.join(FIG_FORMATS)} (got {FIG_FORMAT!r})")
+    sys.exit(1)
+SAVE_KW = dict(dpi=150, bbox_inches='tight',
+               pil_kwargs={'compress_level': FIG_COMPRESS_LEVEL, 'optimize': False})
+
+
+def save_figure(fig, stem, **kwargs):
+    """Render a figure in memory and write it to stem + '.FIG_FORMAT'; returns the written path"""
+    options = {**SAVE_KW, **kwargs}
+    if FIG_FORMAT != 'png':
+        options.pop('pil_kwargs')  # PNG encoder settings only
+    buf = io.BytesIO()
+    fig.savefig(buf, format=FIG_FORMAT, **options)
+    path = stem.with_suffix(f'.{FIG_FORMAT}')
+    path.write_bytes(buf.getvalue())
+    return path
+
+
 print("="*70)
 print("HW3 FINAL ANALYSIS - Following 2021 PDF Structure")
 print("="*70)
@@ -51,34 +81,34 @@ print(f"Using data: {DATA_FILE}")
 # ============================================================================
 # Load and Validate Data
 # ============================================================================
-df = pd.read_csv(DATA_FILE)
+if DATA_FILE.suffix == ".parquet":
+    df = pd.read_parquet(DATA_FILE)
+else:
+    df = pd.read_csv(DATA_FILE)
 
 # Auto-detect column names (handle variations)
+# Each column takes the first rule whose keywords all appear in its name
+COLUMN_RULES = [
+    (('year',), 'Year'),
+    (('organization',), 'Organization'),
+    (('request',), 'Request'),
+    (('award',), 'Award'),
+    (('total', 'score'), 'Total_Score'),
+    (('app', 'type'), 'App_Type'),
+    (('priority', 'category'), 'Priority_Category'),
+    (('impact', 'score'), 'Score_Impact'),
+    (('principle', 'score'), 'Score_Principles'),
+    (('capacity', 'score'), 'Score_Capacity'),
+    (('collab', 'score'), 'Score_Collab'),
+]
+
 col_map = {}
 for col in df.columns:
     col_lower = col.lower()
-    if 'year' in col_lower:
-        col_map['Year'] = col
-    elif 'organization' in col_lower:
-        col_map['Organization'] = col
-    elif 'request' in col_lower or col == 'Request':
-        col_map['Request'] = col
-    elif 'award' in col_lower or col == 'Award':
-        col_map['Award'] = col
-    elif 'total' in col_lower and 'score' in col_lower or col == 'Total_Score':
-        col_map['Total_Score'] = col
-    elif 'app' in col_lower and 'type' in col_lower or col == 'App_Type':
-        col_map['App_Type'] = col
-    elif 'priority' in col_lower and 'category' in col_lower or col == 'Priority_Category':
-        col_map['Priority_Category'] = col
-    elif 'impact' in col_lower and 'score' in col_lower or col == 'Score_Impact':
-        col_map['Score_Impact'] = col
-    elif 'principle' in col_lower and 'score' in col_lower or col == 'Score_Principles':
-        col_map['Score_Principles'] = col
-    elif 'capacity' in col_lower and 'score' in col_lower or col == 'Score_Capacity':
-        col_map['Score_Capacity'] = col
-    elif 'collab' in col_lower and 'score' in col_lower or col == 'Score_Collab':
-        col_map['Score_Collab'] = col
+    for keywords, name in COLUMN_RULES:
+        if all(k in col_lower for k in keywords):
+            col_map[name] = col
+            break
 
 print(f"\nDetected columns:")
 for key, val in col_map.items():
@@ -93,19 +123,43 @@ df = df.rename(columns={
     col_map.get('Priority_Category', 'Priority_Category'): 'Priority_Category',
 })
 
+# Repeated group/filter keys as categoricals (integer codes instead of strings)
+for col in ['App_Type', 'Priority_Category', 'Organization']:
+    df[col] = df[col].astype('category')
+
+# Funding and score columns as float32 for analysis (the cleaned files keep full float64 precision)
+float_cols = [c for c in df.columns if c in ('Request', 'Award', 'Total_Score') or c.startswith('Score_')]
+df = df.astype(dict.fromkeys(float_cols, 'float32'))
+
 print(f"\nData loaded: {len(df)} records")
-print(f"Years: {sorted(df['Year'].unique())}")
+# Sorted years, computed once and reused for every per-year axis
+years = sorted(df['Year'].unique())
+years_labels = [str(int(y)) for y in years]
+print(f"Years: {years}")
+
+# Funding (page 6) and score (page 8) ranges, binned once for both categories
+bins = [0, 20000, 40000, 60000, 80000, 100000, 120000, 140000, 200000, 500000]
+labels = ['0-20k', '20-40k', '40-60k', '60-80k', '80-100k', '100-120k', '120-140k', '140-200k', '200k+']
+df['Funding_Range'] = pd.cut(df['Request'], bins=bins, labels=labels)
+
+score_bins = [0, 75, 80, 85, 90, 95, 100]
+score_labels = ['0-75', '75-80', '80-85', '85-90', '90-95', '95-100']
+df['Score_Range'] = pd.cut(df['Total_Score'], bins=score_bins, labels=score_labels)
+
+# Funded indicator: one grouped pass gives both applied and funded counts
+df['is_funded'] = df['Award'].notna().astype('int8')
 
 # Separate by category
 df_ss = df[df['App_Type'] == 'Social Services'].copy()
 df_con = df[df['App_Type'] == 'Construction/Development'].copy()
 
+# Funded subsets, reused by the page 4 and page 5 tables
+df_ss_funded = df_ss[df_ss['Award'].notna()]
+df_con_funded = df_con[df_con['Award'].notna()]
+
 print(f"\nSocial Services: {len(df_ss)} records")
 print(f"Construction/Development: {len(df_con)} records")
 
-years = sorted(df['Year'].unique())
-years_labels = [str(int(y)) for y in years]
-
 # ============================================================================
 # PAGE 2: Summary Metrics (CHART)
 # ============================================================================
@@ -113,10 +167,16 @@ print(f"\n{'='*70}")
 print("Generating Page 2: Summary Metrics")
 print(f"{'='*70}")
 
+# One grouped pass feeds all four panels
+summary = df.groupby(['Year', 'App_Type'], observed=True).agg(
+    n=('Organization', 'size'),
+    mean_score=('Total_Score', 'mean'),
+).unstack('App_Type')
+
 fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
 # Total applications
-apps_by_year = df.groupby('Year').size()
+apps_by_year = summary['n'].sum(axis=1)
 axes[0, 0].bar(range(len(years)), apps_by_year.values, color='#2E5090', width=0.6)
 axes[0, 0].set_xticks(range(len(years)))
 axes[0, 0].set_xticklabels(years_labels, fontsize=12)
@@ -127,7 +187,7 @@ for i, val in enumerate(apps_by_year.values):
     axes[0, 0].text(i, val + 0.5, str(int(val)), ha='center', fontweight='bold', fontsize=14)
 
 # By category
-apps_by_cat = df.groupby(['Year', 'App_Type']).size().unstack(fill_value=0)
+apps_by_cat = summary['n'].fillna(0)
 x = np.arange(len(years))
 width = 0.35
 axes[0, 1].bar(x - width/2, apps_by_cat['Social Services'], width, 
@@ -142,7 +202,7 @@ axes[0, 1].legend(fontsize=10)
 axes[0, 1].grid(True, alpha=0.3, axis='y')
 
 # SS avg score
-avg_score_ss = df_ss.groupby('Year')['Total_Score'].mean()
+avg_score_ss = summary['mean_score']['Social Services'].dropna()
 axes[1, 0].bar(range(len(avg_score_ss)), avg_score_ss.values, color='#2E5090', width=0.6)
 axes[1, 0].set_xticks(range(len(avg_score_ss)))
 axes[1, 0].set_xticklabels([str(int(y)) for y in avg_score_ss.index], fontsize=12)
@@ -154,7 +214,7 @@ for i, val in enumerate(avg_score_ss.values):
     axes[1, 0].text(i, val + 0.7, f'{val:.1f}', ha='center', fontweight='bold', fontsize=13)
 
 # CON avg score
-avg_score_con = df_con.groupby('Year')['Total_Score'].mean()
+avg_score_con = summary['mean_score']['Construction/Development'].dropna()
 axes[1, 1].bar(range(len(avg_score_con)), avg_score_con.values, color='#F4B183', width=0.6)
 axes[1, 1].set_xticks(range(len(avg_score_con)))
 axes[1, 1].set_xticklabels([str(int(y)) for y in avg_score_con.index], fontsize=12)
@@ -167,9 +227,9 @@ for i, val in enumerate(avg_score_con.values):
 
 plt.suptitle('Summary Metrics By Year', fontsize=18, fontweight='bold', y=0.995)
 plt.tight_layout()
-plt.savefig(CHARTS_DIR / 'page2_summary_metrics.png', dpi=300, bbox_inches='tight')
-print("✓ page2_summary_metrics.png")
-plt.close()
+out = save_figure(fig, CHARTS_DIR / 'page2_summary_metrics')
+print(f"✓ {out.name}")
+plt.close(fig)
 
 # ============================================================================
 # PAGE 3: Applicants (TABLES)
@@ -179,7 +239,8 @@ print("Generating Page 3: Applicants Tables")
 print(f"{'='*70}")
 
 # SS applicants
-applicants_ss = df_ss.groupby(['Organization', 'Year']).size().unstack(fill_value=0)
+ct_apps_ss = pd.crosstab(df_ss['Organization'], df_ss['Year'])
+applicants_ss = ct_apps_ss.copy()
 applicants_ss['Total'] = applicants_ss.sum(axis=1)
 applicants_ss = applicants_ss.sort_values('Total', ascending=False).head(15).reset_index()
 applicants_ss.columns = ['Organization'] + [str(int(c)) if c != 'Total' else c for c in applicants_ss.columns[1:]]
@@ -187,7 +248,8 @@ applicants_ss.to_csv(TABLES_DIR / 'page3_applicants_ss.csv', index=False)
 print("✓ page3_applicants_ss.csv")
 
 # CON applicants
-applicants_con = df_con.groupby(['Organization', 'Year']).size().unstack(fill_value=0)
+ct_apps_con = pd.crosstab(df_con['Organization'], df_con['Year'])
+applicants_con = ct_apps_con.copy()
 applicants_con['Total'] = applicants_con.sum(axis=1)
 applicants_con = applicants_con.sort_values('Total', ascending=False).head(15).reset_index()
 applicants_con.columns = ['Organization'] + [str(int(c)) if c != 'Total' else c for c in applicants_con.columns[1:]]
@@ -202,9 +264,9 @@ print("Generating Page 4: Funded Tables")
 print(f"{'='*70}")
 
 # SS funded
-funded_ss_by_year = df_ss[df_ss['Award'].notna()].groupby(['Organization', 'Year']).size().unstack(fill_value=0)
-total_apps_ss = df_ss.groupby('Organization').size()
-total_funded_ss = df_ss[df_ss['Award'].notna()].groupby('Organization').size()
+funded_ss_by_year = pd.crosstab(df_ss_funded['Organization'], df_ss_funded['Year'])
+total_apps_ss = ct_apps_ss.sum(axis=1)
+total_funded_ss = funded_ss_by_year.sum(axis=1)
 
 funded_ss = funded_ss_by_year.copy()
 funded_ss['Total_Funded'] = total_funded_ss
@@ -216,9 +278,9 @@ funded_ss.to_csv(TABLES_DIR / 'page4_funded_ss.csv', index=False)
 print("✓ page4_funded_ss.csv")
 
 # CON funded
-funded_con_by_year = df_con[df_con['Award'].notna()].groupby(['Organization', 'Year']).size().unstack(fill_value=0)
-total_apps_con = df_con.groupby('Organization').size()
-total_funded_con = df_con[df_con['Award'].notna()].groupby('Organization').size()
+funded_con_by_year = pd.crosstab(df_con_funded['Organization'], df_con_funded['Year'])
+total_apps_con = ct_apps_con.sum(axis=1)
+total_funded_con = funded_con_by_year.sum(axis=1)
 
 funded_con = funded_con_by_year.copy()
 funded_con['Total_Funded'] = total_funded_con
@@ -236,15 +298,15 @@ print(f"\n{'='*70}")
 print("Generating Page 5: Priority Tables")
 print(f"{'='*70}")
 
-# SS priority
-priority_ss_app = df_ss.groupby(['Priority_Category', 'Year']).size().unstack(fill_value=0)
-priority_ss_fund = df_ss[df_ss['Award'].notna()].groupby(['Priority_Category', 'Year']).size().unstack(fill_value=0)
+# One grouped pass over both categories; each table takes its slice
+priority_counts = df.groupby(['App_Type', 'Priority_Category', 'Year'], observed=True)['is_funded'].agg(['size', 'sum'])
 
-priority_ss_app['Total_Applied'] = priority_ss_app.sum(axis=1)
-priority_ss_fund['Total_Funded'] = priority_ss_fund.sum(axis=1)
+# SS priority
+priority_ss = priority_counts.xs('Social Services', level='App_Type').unstack(fill_value=0)
 
-priority_ss_table = priority_ss_app.copy()
-priority_ss_table['Total_Funded'] = priority_ss_fund['Total_Funded']
+priority_ss_table = priority_ss['size'].copy()
+priority_ss_table['Total_Applied'] = priority_ss['size'].sum(axis=1)
+priority_ss_table['Total_Funded'] = priority_ss['sum'].sum(axis=1)
 priority_ss_table['Fund_%'] = (priority_ss_table['Total_Funded'] / priority_ss_table['Total_Applied'] * 100).round(0).astype(int)
 priority_ss_table = priority_ss_table.reset_index()
 priority_ss_table.columns = ['Priority'] + [str(int(c)) if isinstance(c, (int, float)) and c not in ['Total_Applied', 'Total_Funded', 'Fund_%'] else c for c in priority_ss_table.columns[1:]]
@@ -252,14 +314,11 @@ priority_ss_table.to_csv(TABLES_DIR / 'page5_priority_ss.csv', index=False)
 print("✓ page5_priority_ss.csv")
 
 # CON priority
-priority_con_app = df_con.groupby(['Priority_Category', 'Year']).size().unstack(fill_value=0)
-priority_con_fund = df_con[df_con['Award'].notna()].groupby(['Priority_Category', 'Year']).size().unstack(fill_value=0)
-
-priority_con_app['Total_Applied'] = priority_con_app.sum(axis=1)
-priority_con_fund['Total_Funded'] = priority_con_fund.sum(axis=1)
+priority_con = priority_counts.xs('Construction/Development', level='App_Type').unstack(fill_value=0)
 
-priority_con_table = priority_con_app.copy()
-priority_con_table['Total_Funded'] = priority_con_fund['Total_Funded']
+priority_con_table = priority_con['size'].copy()
+priority_con_table['Total_Applied'] = priority_con['size'].sum(axis=1)
+priority_con_table['Total_Funded'] = priority_con['sum'].sum(axis=1)
 priority_con_table['Fund_%'] = (priority_con_table['Total_Funded'] / priority_con_table['Total_Applied'] * 100).round(0).astype(int)
 priority_con_table = priority_con_table.reset_index()
 priority_con_table.columns = ['Priority'] + [str(int(c)) if isinstance(c, (int, float)) and c not in ['Total_Applied', 'Total_Funded', 'Fund_%'] else c for c in priority_con_table.columns[1:]]
@@ -273,14 +332,13 @@ print(f"\n{'='*70}")
 print("Generating Page 6: Funding Distribution Heatmap")
 print(f"{'='*70}")
 
-bins = [0, 20000, 40000, 60000, 80000, 100000, 120000, 140000, 200000, 500000]
-labels = ['0-20k', '20-40k', '40-60k', '60-80k', '80-100k', '100-120k', '120-140k', '140-200k', '200k+']
-
 fig, axes = plt.subplots(2, 1, figsize=(12, 10))
 
+# One grouped pass over both categories; sort_index restores bin order after slicing
+funding_counts = df.groupby(['App_Type', 'Year', 'Funding_Range'], observed=True).size()
+
 # SS heatmap
-df_ss['Funding_Range'] = pd.cut(df_ss['Request'], bins=bins, labels=labels)
-funding_ss = df_ss.groupby(['Year', 'Funding_Range'], observed=True).size().unstack(fill_value=0)
+funding_ss = funding_counts.xs('Social Services', level='App_Type').unstack(fill_value=0).sort_index(axis=1)
 funding_ss_display = funding_ss.T
 funding_ss_display.columns = [str(int(c)) for c in funding_ss_display.columns]
 
@@ -291,8 +349,7 @@ axes[0].set_xlabel('Year', fontsize=12)
 axes[0].set_ylabel('Funding Request Range', fontsize=12)
 
 # CON heatmap
-df_con['Funding_Range'] = pd.cut(df_con['Request'], bins=bins, labels=labels)
-funding_con = df_con.groupby(['Year', 'Funding_Range'], observed=True).size().unstack(fill_value=0)
+funding_con = funding_counts.xs('Construction/Development', level='App_Type').unstack(fill_value=0).sort_index(axis=1)
 funding_con_display = funding_con.T
 funding_con_display.columns = [str(int(c)) for c in funding_con_display.columns]
 
@@ -304,9 +361,9 @@ axes[1].set_xlabel('Year', fontsize=12)
 axes[1].set_ylabel('Funding Request Range', fontsize=12)
 
 plt.tight_layout()
-plt.savefig(CHARTS_DIR / 'page6_funding_distribution.png', dpi=300, bbox_inches='tight')
-print("✓ page6_funding_distribution.png")
-plt.close()
+out = save_figure(fig, CHARTS_DIR / 'page6_funding_distribution')
+print(f"✓ {out.name}")
+plt.close(fig)
 
 # ============================================================================
 # PAGE 7: Score vs Funding (SCATTER)
@@ -321,7 +378,7 @@ fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 df_ss_scores = df_ss[df_ss['Total_Score'].notna()]
 scatter1 = axes[0].scatter(df_ss_scores['Request'], df_ss_scores['Total_Score'], 
                           alpha=0.6, s=120, c=df_ss_scores['Year'], cmap='viridis', 
-                          edgecolors='black', linewidth=0.5)
+                          edgecolors='black', linewidth=0.5, rasterized=True)
 axes[0].set_title('Project Score by Funding Request - Social Services', 
                  fontsize=13, fontweight='bold')
 axes[0].set_xlabel('Funding Request ($)', fontsize=11)
@@ -330,13 +387,13 @@ axes[0].grid(True, alpha=0.3)
 axes[0].set_ylim([75, 100])
 cbar1 = plt.colorbar(scatter1, ax=axes[0])
 cbar1.set_label('Year', fontsize=10)
-cbar1.set_ticks([2022, 2023, 2024, 2025])
+cbar1.set_ticks(years)
 
 # CON scatter
 df_con_scores = df_con[df_con['Total_Score'].notna()]
 scatter2 = axes[1].scatter(df_con_scores['Request'], df_con_scores['Total_Score'], 
                           alpha=0.6, s=120, c=df_con_scores['Year'], cmap='plasma',
-                          edgecolors='black', linewidth=0.5)
+                          edgecolors='black', linewidth=0.5, rasterized=True)
 axes[1].set_title('Project Score by Funding Request - Construction/Development', 
                  fontsize=13, fontweight='bold')
 axes[1].set_xlabel('Funding Request ($)', fontsize=11)
@@ -345,12 +402,12 @@ axes[1].grid(True, alpha=0.3)
 axes[1].set_ylim([60, 95])
 cbar2 = plt.colorbar(scatter2, ax=axes[1])
 cbar2.set_label('Year', fontsize=10)
-cbar2.set_ticks([2022, 2023, 2024, 2025])
+cbar2.set_ticks(years)
 
 plt.tight_layout()
-plt.savefig(CHARTS_DIR / 'page7_score_vs_funding.png', dpi=300, bbox_inches='tight')
-print("✓ page7_score_vs_funding.png")
-plt.close()
+out = save_figure(fig, CHARTS_DIR / 'page7_score_vs_funding')
+print(f"✓ {out.name}")
+plt.close(fig)
 
 # ============================================================================
 # PAGE 8: Score Distribution (STACKED BAR)
@@ -359,18 +416,24 @@ print(f"\n{'='*70}")
 print("Generating Page 8: Score Distribution")
 print(f"{'='*70}")
 
-score_bins = [0, 75, 80, 85, 90, 95, 100]
-score_labels = ['0-75', '75-80', '80-85', '85-90', '90-95', '95-100']
-
 fig, axes = plt.subplots(2, 1, figsize=(12, 10))
 
-# SS stacked
-df_ss['Score_Range'] = pd.cut(df_ss['Total_Score'], bins=score_bins, labels=score_labels)
-score_dist_ss = df_ss.groupby(['Year', 'Score_Range'], observed=True).size().unstack(fill_value=0)
+# Stacked bars are drawn straight from the count matrix, one bar call per score range
+SCORE_COLORS = ['#8B0000', '#CD5C5C', '#F0E68C', '#90EE90', '#228B22', '#006400']
 
-score_dist_ss.plot(kind='bar', stacked=True, ax=axes[0], 
-                  color=['#8B0000', '#CD5C5C', '#F0E68C', '#90EE90', '#228B22', '#006400'],
-                  width=0.7)
+# One grouped pass over both categories; sort_index restores bin order after slicing
+score_counts = df.groupby(['App_Type', 'Year', 'Score_Range'], observed=True).size()
+
+# SS stacked
+score_dist_ss = score_counts.xs('Social Services', level='App_Type').unstack(fill_value=0).sort_index(axis=1)
+
+counts = score_dist_ss.to_numpy()
+bottoms = np.cumsum(counts, axis=1) - counts
+x = np.arange(len(counts))
+for j, (score_range, color) in enumerate(zip(score_dist_ss.columns, SCORE_COLORS)):
+    axes[0].bar(x, counts[:, j], 0.7, bottom=bottoms[:, j], color=color, label=score_range)
+axes[0].set_xticks(x)
+axes[0].set_xlim(x[0] - 0.6, x[-1] + 0.6)  # Same edge padding as DataFrame.plot bars
 axes[0].set_title('Score Distribution by Year - Social Services', 
                  fontsize=14, fontweight='bold', pad=10)
 axes[0].set_xlabel('Year', fontsize=12)
@@ -380,12 +443,15 @@ axes[0].set_xticklabels([str(int(y)) for y in score_dist_ss.index], rotation=0,
 axes[0].grid(True, alpha=0.3, axis='y')
 
 # CON stacked
-df_con['Score_Range'] = pd.cut(df_con['Total_Score'], bins=score_bins, labels=score_labels)
-score_dist_con = df_con.groupby(['Year', 'Score_Range'], observed=True).size().unstack(fill_value=0)
-
-score_dist_con.plot(kind='bar', stacked=True, ax=axes[1], 
-                   color=['#8B0000', '#CD5C5C', '#F0E68C', '#90EE90', '#228B22', '#006400'],
-                   width=0.7)
+score_dist_con = score_counts.xs('Construction/Development', level='App_Type').unstack(fill_value=0).sort_index(axis=1)
+
+counts = score_dist_con.to_numpy()
+bottoms = np.cumsum(counts, axis=1) - counts
+x = np.arange(len(counts))
+for j, (score_range, color) in enumerate(zip(score_dist_con.columns, SCORE_COLORS)):
+    axes[1].bar(x, counts[:, j], 0.7, bottom=bottoms[:, j], color=color, label=score_range)
+axes[1].set_xticks(x)
+axes[1].set_xlim(x[0] - 0.6, x[-1] + 0.6)  # Same edge padding as DataFrame.plot bars
 axes[1].set_title('Score Distribution by Year - Construction/Development', 
                  fontsize=14, fontweight='bold', pad=10)
 axes[1].set_xlabel('Year', fontsize=12)
@@ -395,9 +461,9 @@ axes[1].set_xticklabels([str(int(y)) for y in score_dist_con.index], rotation=0,
 axes[1].grid(True, alpha=0.3, axis='y')
 
 plt.tight_layout()
-plt.savefig(CHARTS_DIR / 'page8_score_distribution.png', dpi=300, bbox_inches='tight')
-print("✓ page8_score_distribution.png")
-plt.close()
+out = save_figure(fig, CHARTS_DIR / 'page8_score_distribution')
+print(f"✓ {out.name}")
+plt.close(fig)
 
 # ============================================================================
 # PAGE 9: Scoring Breakdown (TABLE + CHART)
@@ -411,29 +477,27 @@ score_cols = ['Score_Impact', 'Score_Principles', 'Score_Capacity', 'Score_Colla
 has_breakdown = all(col in df.columns for col in score_cols)
 
 if has_breakdown:
-    df_breakdown = df[df['Score_Impact'].notna()].copy()
-    
-    if len(df_breakdown) > 0:
+    # Per-category means of all four sections in one grouped pass (mean skips unscored rows,
+    # reindex sets the order)
+    score_means = (df.groupby('App_Type', observed=True, sort=False)[score_cols].mean()
+                   .reindex(['Social Services', 'Construction/Development']))
+
+    if not score_means.dropna(how='all').empty:
         # Create table
-        max_points = [30, 30, 25, 15]
-        breakdown_data = []
-        
-        for i, col in enumerate(score_cols):
-            ss_avg = df_breakdown[df_breakdown['App_Type'] == 'Social Services'][col].mean()
-            ss_pct = (ss_avg / max_points[i] * 100).round(0)
-            con_avg = df_breakdown[df_breakdown['App_Type'] == 'Construction/Development'][col].mean()
-            con_pct = (con_avg / max_points[i] * 100).round(0)
-            
-            breakdown_data.append({
-                'Category': col.replace('Score_', ''),
-                'Max_Points': max_points[i],
-                'SS_Avg': round(ss_avg, 1),
-                'SS_%': int(ss_pct),
-                'CON_Avg': round(con_avg, 1) if not np.isnan(con_avg) else 0,
-                'CON_%': int(con_pct) if not np.isnan(con_pct) else 0
-            })
+        max_points = np.array([30, 30, 25, 15])
+
+        ss_avg, con_avg = score_means.to_numpy()
+        ss_pct = np.round(np.divide(ss_avg, max_points) * 100)
+        con_pct = np.round(np.divide(con_avg, max_points) * 100)
         
-        breakdown_table = pd.DataFrame(breakdown_data)
+        breakdown_table = pd.DataFrame({
+            'Category': [col.replace('Score_', '') for col in score_cols],
+            'Max_Points': max_points,
+            'SS_Avg': np.nan_to_num(np.round(ss_avg, 1)),
+            'SS_%': np.nan_to_num(ss_pct).astype(int),
+            'CON_Avg': np.nan_to_num(np.round(con_avg, 1)),
+            'CON_%': np.nan_to_num(con_pct).astype(int),
+        })
         breakdown_table.to_csv(TABLES_DIR / 'page9_scoring_breakdown.csv', index=False)
         print("✓ page9_scoring_breakdown.csv")
         
@@ -460,17 +524,19 @@ if has_breakdown:
         ax.grid(True, alpha=0.3, axis='y')
         ax.set_ylim([0, 32])
         
+        # Only a missing section mean (NaN before zero-filling) goes unlabelled
         for i in range(len(score_cols)):
-            ax.text(i - width/2, ss_scores[i] + 0.5, f'{ss_scores[i]:.1f}', 
-                   ha='center', fontweight='bold', fontsize=10)
-            if con_scores[i] > 0:
+            if not np.isnan(ss_avg[i]):
+                ax.text(i - width/2, ss_scores[i] + 0.5, f'{ss_scores[i]:.1f}', 
+                       ha='center', fontweight='bold', fontsize=10)
+            if not np.isnan(con_avg[i]):
                 ax.text(i + width/2, con_scores[i] + 0.5, f'{con_scores[i]:.1f}', 
                        ha='center', fontweight='bold', fontsize=10)
         
         plt.tight_layout()
-        plt.savefig(CHARTS_DIR / 'page9_scoring_breakdown.png', dpi=300, bbox_inches='tight')
-        print("✓ page9_scoring_breakdown.png")
-        plt.close()
+        out = save_figure(fig, CHARTS_DIR / 'page9_scoring_breakdown')
+        print(f"✓ {out.name}")
+        plt.close(fig)
     else:
         print("  ⚠ No scoring breakdown data available")
 else:
@@ -484,12 +550,12 @@ print(f"\n{'='*70}")
 print("GENERATION COMPLETE")
 print(f"{'='*70}")
 print(f"\n📊 CHARTS generated in: {CHARTS_DIR}/")
-print(f"  - page2_summary_metrics.png")
-print(f"  - page6_funding_distribution.png")
-print(f"  - page7_score_vs_funding.png")
-print(f"  - page8_score_distribution.png")
+print(f"  - page2_summary_metrics.{FIG_FORMAT}")
+print(f"  - page6_funding_distribution.{FIG_FORMAT}")
+print(f"  - page7_score_vs_funding.{FIG_FORMAT}")
+print(f"  - page8_score_distribution.{FIG_FORMAT}")
 if has_breakdown:
-    print(f"  - page9_scoring_breakdown.png")
+    print(f"  - page9_scoring_breakdown.{FIG_FORMAT}")
 
 print(f"\n📋 TABLES generated in: {TABLES_DIR}/")
 print(f"  - page3_applicants_ss.csv / page3_applicants_con.csv")
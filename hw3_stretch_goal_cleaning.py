@@ -5,6 +5,8 @@ Compares trends from 2016-2022 period vs 2022-2026 period
 import pandas as pd
 import numpy as np
 import re
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 
 # ============================================================================
@@ -13,131 +15,120 @@ from pathlib import Path
 DATA_2016_2022 = Path("data/2016-2022 Case Data.xlsx")
 OUTPUT_DIR = Path("hw3_output")
 OUTPUT_DIR.mkdir(exist_ok=True)
+YEAR_RE = re.compile(r"(20\d{2})")
+SUMMARY_ROW_RE = re.compile(r"total|subtotal|available|cap|estimated", re.IGNORECASE)
+NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"  # Text accepted by to_number
+# Compact dtypes for the combined output; Year is nullable because of extract_year.
+# Funding and scores stay float64 so the cleaned files keep every cent and digit.
+DOWNCAST_DTYPES = {"Year": "Int16"}
 
 # ============================================================================
 # Helper Functions (reuse from main script)
 # ============================================================================
 
-def to_number(value):
-    """Convert string to numeric"""
-    if pd.isna(value):
-        return np.nan
-    s = str(value).replace(",", "").replace("$", "").strip()
-    try:
-        return float(s)
-    except:
-        return np.nan
+def to_number(values):
+    """Convert a Series to numeric"""
+    numbers = pd.to_numeric(values, errors="coerce")
+    text = pc.utf8_trim_whitespace(
+        pc.replace_substring_regex(pa.array(values.astype(str)), r"[,$]", ""))
+    # Arrow's cast raises on bad text, so null out anything that isn't a number first
+    text = pc.if_else(pc.match_substring_regex(text, NUMBER_PATTERN), text, None)
+    parsed = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+    return numbers.fillna(pd.Series(parsed, index=values.index)).astype(float)
 
 
 def extract_year(text):
     """Extract year from text"""
-    match = re.search(r"(20\d{2})", str(text))
+    match = YEAR_RE.search(str(text))
     return int(match.group(1)) if match else np.nan
 
 
-def classify_app_type(text):
-    """Classify application type"""
-    s = str(text).strip().lower()
-    if "social" in s or s == "ss":
-        return "Social Services"
-    if any(x in s for x in ["con", "dev", "econ"]):
-        return "Construction/Development"
-    return "Other"
-
-
-def classify_priority(text):
-    """Classify priority (including old codes BN, SN, WS)"""
-    s = str(text).strip().upper()
-    if s in ("NAN", "NONE", "", "ALL"):
-        return "Unknown"
-    # Current priorities
-    if "HOMELESS" in s or "ANGHP" in s:
-        return "ANGHP"
-    if "ECONOMIC" in s or "EO" in s:
-        return "EO"
-    if "NEIGHBORHOOD" in s or "NI" in s:
-        return "NI"
-    if "HOUSING" in s or "HA" in s:
-        return "HA"
-    # Old priority codes (2015-2016 period)
-    if "BN" in s:
-        return "BN"  # Basic Needs
-    if "SN" in s:
-        return "SN"  # Special Needs  
-    if "WS" in s:
-        return "WS"  # Workforce Support
-    return "Other"
+def classify_app_type(values):
+    """Classify application types in a Series"""
+    s = values.astype(str).str.strip().str.lower()
+    conditions = [
+        s.str.contains("social", na=False) | (s == "ss"),
+        s.str.contains("con|dev|econ", regex=True, na=False),
+    ]
+    return np.select(conditions, ["Social Services", "Construction/Development"], default="Other")
+
+
+def classify_priority(values):
+    """Classify priorities in a Series (including old codes BN, SN, WS)"""
+    s = values.astype(str).str.strip().str.upper()
+    conditions = [
+        values.isna() | s.isin(["NAN", "NONE", "", "ALL"]),
+        # Current priorities
+        s.str.contains("HOMELESS|ANGHP", regex=True, na=False),
+        s.str.contains("ECONOMIC|EO", regex=True, na=False),
+        s.str.contains("NEIGHBORHOOD|NI", regex=True, na=False),
+        s.str.contains("HOUSING|HA", regex=True, na=False),
+        # Old priority codes (2015-2016 period)
+        s.str.contains("BN", na=False),  # Basic Needs
+        s.str.contains("SN", na=False),  # Special Needs
+        s.str.contains("WS", na=False),  # Workforce Support
+    ]
+    choices = ["Unknown", "ANGHP", "EO", "NI", "HA", "BN", "SN", "WS"]
+    return np.select(conditions, choices, default="Other")
 
 
 def is_summary_row(org):
-    """Check if row is a summary"""
-    if pd.isna(org):
-        return True
-    s = str(org).lower()
-    return bool(re.search(r"total|subtotal|available|cap|estimated", s))
+    """Flag summary rows in an org Series"""
+    return org.isna() | org.astype(str).str.contains(SUMMARY_ROW_RE, na=True)
 
 
 # ============================================================================
 # Process 2016-2022 Data
 # ============================================================================
 
-def clean_2016_2022_sheet(sheet_name, file_path):
+def clean_2016_2022_sheet(sheet_name, raw):
     """
     Clean a sheet from 2016-2022 data file
     
     Args:
         sheet_name: Name of worksheet
-        file_path: Path to Excel file
+        raw: DataFrame of that worksheet, read with its header row
         
     Returns:
         DataFrame with cleaned data
     """
     print(f"\nProcessing: {sheet_name}")
     
-    # 2016-2022 format typically uses header row 1
-    header = 1
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=header)
-    df = df.dropna(how="all")
+    df = raw.dropna(how="all")
     year = extract_year(sheet_name)
     
     cols = df.columns
+    lc = [str(c).lower() for c in cols]  # Lowercased once for all keyword searches
     
     # Identify columns
     col_idx = {
-        "Type": next((i for i, c in enumerate(cols) if "type" in str(c).lower()), 1),
-        "Priority": next((i for i, c in enumerate(cols) if 
-                         "priority" in str(c).lower() and "impact" not in str(c).lower()), 2),
-        "Org": next((i for i, c in enumerate(cols) if "organization" in str(c).lower()), 3),
-        "Project": next((i for i, c in enumerate(cols) if 
-                        "project" in str(c).lower() or "program" in str(c).lower()), 4),
-        "Request": next((i for i, c in enumerate(cols) if "request" in str(c).lower()), 5),
+        "Type": next((i for i, c in enumerate(lc) if "type" in c), 1),
+        "Priority": next((i for i, c in enumerate(lc) if 
+                         "priority" in c and "impact" not in c), 2),
+        "Org": next((i for i, c in enumerate(lc) if "organization" in c), 3),
+        "Project": next((i for i, c in enumerate(lc) if 
+                        "project" in c or "program" in c), 4),
+        "Request": next((i for i, c in enumerate(lc) if "request" in c), 5),
         "Award": len(cols) - 1,
-        "Total_Score": next((i for i, c in enumerate(cols) if 
-                            "total" in str(c).lower() or "score" in str(c).lower()), None)
+        "Total_Score": next((i for i, c in enumerate(lc) if 
+                            "total" in c or "score" in c), None)
     }
     
-    # Extract data
-    records = []
-    for _, row in df.iterrows():
-        org = row.iloc[col_idx["Org"]]
-        
-        if is_summary_row(org):
-            continue
-        
-        records.append({
-            "Year": year,
-            "Organization": str(org).strip(),
-            "Project": row.iloc[col_idx["Project"]],
-            "Type": row.iloc[col_idx["Type"]],
-            "Priority": row.iloc[col_idx["Priority"]],
-            "Funding_Request": to_number(row.iloc[col_idx["Request"]]),
-            "Funding_Award": to_number(row.iloc[col_idx["Award"]]),
-            "Total_Score": to_number(row.iloc[col_idx["Total_Score"]]) if col_idx["Total_Score"] else np.nan,
-        })
-    
-    result = pd.DataFrame(records)
-    result["App_Type"] = result["Type"].apply(classify_app_type)
-    result["Priority_Category"] = result["Priority"].apply(classify_priority)
+    # Extract data (column-wise, summary rows masked out once)
+    sub = df.loc[~is_summary_row(df.iloc[:, col_idx["Org"]])]
+    
+    result = pd.DataFrame({
+        "Year": year,
+        "Organization": sub.iloc[:, col_idx["Org"]].astype(str).str.strip(),
+        "Project": sub.iloc[:, col_idx["Project"]],
+        "Type": sub.iloc[:, col_idx["Type"]],
+        "Priority": sub.iloc[:, col_idx["Priority"]],
+        "Funding_Request": to_number(sub.iloc[:, col_idx["Request"]]),
+        "Funding_Award": to_number(sub.iloc[:, col_idx["Award"]]),
+        "Total_Score": to_number(sub.iloc[:, col_idx["Total_Score"]]) if col_idx["Total_Score"] else np.nan,
+    }, index=sub.index).reset_index(drop=True)
+    result["App_Type"] = classify_app_type(result["Type"])
+    result["Priority_Category"] = classify_priority(result["Priority"])
     
     print(f"  Extracted {len(result)} records")
     return result
@@ -150,18 +141,21 @@ def main():
     print("STRETCH GOAL: Cleaning 2016-2022 Data")
     print("="*70)
     
-    xlsx = pd.ExcelFile(DATA_2016_2022)
-    print(f"\nWorksheets: {xlsx.sheet_names}")
-    
-    all_data = [clean_2016_2022_sheet(sheet, DATA_2016_2022) 
-                for sheet in xlsx.sheet_names]
+    # Read every sheet in one pass over the workbook
+    # 2016-2022 format typically uses header row 1
+    sheets = pd.read_excel(DATA_2016_2022, sheet_name=None, header=1)
+    print(f"\nWorksheets: {list(sheets)}")
     
-    combined = pd.concat(all_data, ignore_index=True)
+    # Pop each raw sheet as it is cleaned so it can be freed before the concat
+    combined = pd.concat(
+        (clean_2016_2022_sheet(name, sheets.pop(name)) for name in list(sheets)),
+        ignore_index=True,
+    )
     
     # Filter: keep only Social Services and Construction/Development
     combined = combined[
         combined["App_Type"].isin(["Social Services", "Construction/Development"])
-    ].copy()
+    ].astype(DOWNCAST_DTYPES)
     
     # Summary
     print(f"\n{'='*70}")
@@ -176,10 +170,14 @@ def main():
     print(combined['Priority_Category'].value_counts())
     
     # Save
-    output = OUTPUT_DIR / "cleaned_data_2016_2022.csv"
-    combined.to_csv(output, index=False)
+    # Parquet is what the viz script loads; the CSV is for inspection
+    output = OUTPUT_DIR / "cleaned_data_2016_2022.parquet"
+    combined.to_parquet(output, engine="pyarrow", compression="snappy", index=False)
+    output_csv = output.with_suffix(".csv")
+    combined.to_csv(output_csv, index=False)
     
     print(f"\n✓ Saved to: {output}")
+    print(f"✓ Saved to: {output_csv}")
     print("="*70)
     
     return combined
@@ -4,21 +4,55 @@ Stretch Goal Visualization
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # File output only; no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
+import io
+import os
+import sys
 from pathlib import Path
 
 # ============================================================================
 # Configuration
 # ============================================================================
-DATA_2016_2022 = Path("hw3_output/cleaned_data_2016_2022.csv")
-DATA_2022_2026 = Path("hw3_output/cleaned_data_2022_2026.csv")
+DATA_2016_2022 = Path("hw3_output/cleaned_data_2016_2022.parquet")
+DATA_2022_2026 = Path("hw3_output/cleaned_data_2022_2026.parquet")
 OUTPUT_DIR = Path("hw3_output/figures_stretch_goal")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Only the columns the charts use are read from the Parquet files
+COLUMNS = ['Year', 'Organization', 'App_Type', 'Priority_Category',
+           'Total_Score', 'Funding_Request', 'Funding_Award']
+# Main priorities in plotting order, with one fixed colour each
+PRIORITY_COLORS = pd.Series({'ANGHP': '#e74c3c', 'EO': '#3498db', 'NI': '#2ecc71', 'HA': '#f39c12'})
 
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (16, 10)
 
+# Export settings: layout is fixed by tight_layout, so no extra bbox pass by default
+# Fast PNG deflate by default; set FIG_COMPRESS_LEVEL=6-9 for smaller final files
+FIG_COMPRESS_LEVEL = int(os.getenv('FIG_COMPRESS_LEVEL', '1'))
+# FIG_FORMAT=svg writes vector charts instead (no pixel buffer to rasterize or deflate)
+FIG_FORMAT = os.getenv('FIG_FORMAT', 'png')
+FIG_FORMATS = ('png', 'svg', 'pdf')
+if FIG_FORMAT not in FIG_FORMATS:
+    print(f"ERROR: FIG_FORMAT must be one of {', '.join(FIG_FORMATS)} (got {FIG_FORMAT!r})")
+    sys.exit(1)
+SAVE_KW = dict(dpi=150, pil_kwargs={'compress_level': FIG_COMPRESS_LEVEL, 'optimize': False})
+
+
+def save_figure(fig, stem, **kwargs):
+    """Render a figure in memory and write it to stem + '.FIG_FORMAT'; returns the written path"""
+    options = {**SAVE_KW, **kwargs}
+    if FIG_FORMAT != 'png':
+        options.pop('pil_kwargs')  # PNG encoder settings only
+    buf = io.BytesIO()
+    fig.savefig(buf, format=FIG_FORMAT, **options)
+    path = stem.with_suffix(f'.{FIG_FORMAT}')
+    path.write_bytes(buf.getvalue())
+    return path
+
+
 print("="*70)
 print("STRETCH GOAL: 10-Year Trend Comparison (2016-2026)")
 print("="*70)
@@ -26,8 +60,19 @@ print("="*70)
 # ============================================================================
 # Load Data
 # ============================================================================
-df_old = pd.read_csv(DATA_2016_2022)
-df_new = pd.read_csv(DATA_2022_2026)
+df_old = pd.read_parquet(DATA_2016_2022, columns=COLUMNS)
+df_new = pd.read_parquet(DATA_2022_2026, columns=COLUMNS)
+
+# Group/filter keys as categoricals; one shared dtype per column keeps them categorical through concat
+for col in ['App_Type', 'Priority_Category']:
+    key_dtype = pd.CategoricalDtype(sorted(set(df_old[col].dropna()) | set(df_new[col].dropna())))
+    df_old[col] = df_old[col].astype(key_dtype)
+    df_new[col] = df_new[col].astype(key_dtype)
+
+# Period comes from the source file, tagged before the concat so every table can roll up to it
+period_dtype = pd.CategoricalDtype(['2016-2022', '2022-2026'])
+df_old['Period'] = pd.Series('2016-2022', index=df_old.index, dtype=period_dtype)
+df_new['Period'] = pd.Series('2022-2026', index=df_new.index, dtype=period_dtype)
 
 # Combine for 10-year view
 df_all = pd.concat([df_old, df_new], ignore_index=True)
@@ -46,16 +91,31 @@ print(f"\n{'='*70}")
 print("Generating 10-Year Overview")
 print(f"{'='*70}")
 
+# Counts, sums and non-null counts per (Period, Year) in one grouped pass; the yearly
+# and period (section below) tables are both rolled up from these. dropna=False keeps
+# rows without a Year in their period's totals.
+period_yearly = df_all.groupby(['Period', 'Year'], observed=True, dropna=False).agg(
+    n=('Organization', 'size'),
+    score_sum=('Total_Score', 'sum'),
+    score_n=('Total_Score', 'count'),
+    Funding_Request=('Funding_Request', 'sum'),
+    request_n=('Funding_Request', 'count'),
+    Funding_Award=('Funding_Award', 'sum'),
+    award_n=('Funding_Award', 'count'),
+).astype(float)
+yearly = period_yearly.groupby(level='Year', sort=True).sum()
+yearly['mean_score'] = yearly['score_sum'] / yearly['score_n']
+
 fig = plt.figure(figsize=(16, 12))
 gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
 
 # 1. Application count trend (10 years)
 ax1 = fig.add_subplot(gs[0, :])
-years = sorted(df_all['Year'].unique())
-counts = [len(df_all[df_all['Year'] == yr]) for yr in years]
+years = list(yearly.index)
+counts = yearly['n'].astype(int).tolist()
 
 # Color code by period
-colors = ['steelblue' if yr < 2022 else 'coral' for yr in years]
+colors = np.where(yearly.index < 2022, 'steelblue', 'coral')
 bars = ax1.bar(range(len(years)), counts, color=colors, width=0.7)
 
 ax1.set_xticks(range(len(years)))
@@ -81,7 +141,9 @@ ax1.axvline(x=5.5, color='red', linestyle='--', linewidth=2, alpha=0.5)
 
 # 2. Applications by category (10 years)
 ax2 = fig.add_subplot(gs[1, 0])
-cat_yearly = df_all.groupby(['Year', 'App_Type']).size().unstack(fill_value=0)
+cat_by_period = (df_all.groupby(['Period', 'Year', 'App_Type'], observed=True, dropna=False)
+                 .size().unstack(fill_value=0))
+cat_yearly = cat_by_period.groupby(level='Year', sort=True).sum()
 cat_yearly.plot(kind='bar', ax=ax2, color=['steelblue', 'coral'], width=0.7)
 ax2.set_title('10-Year Trend by Category', fontsize=13, fontweight='bold')
 ax2.set_xlabel('Year', fontsize=11)
@@ -91,12 +153,11 @@ ax2.set_xticklabels(cat_yearly.index, rotation=45)
 ax2.grid(True, alpha=0.3, axis='y')
 
 # 3. Average score trend (10 years)
-ax3 = fig.add_subplot(gs[1, 1])
-avg_scores = df_all.groupby('Year')['Total_Score'].mean()
+# Same year positions as ax1, so ticks and labels come from the shared axis
+ax3 = fig.add_subplot(gs[1, 1], sharex=ax1)
+avg_scores = yearly['mean_score']
 ax3.plot(range(len(avg_scores)), avg_scores.values, 
         marker='o', linewidth=2.5, markersize=8, color='steelblue')
-ax3.set_xticks(range(len(avg_scores)))
-ax3.set_xticklabels(avg_scores.index)
 ax3.set_title('10-Year Average Score Trend', fontsize=13, fontweight='bold')
 ax3.set_xlabel('Year', fontsize=11)
 ax3.set_ylabel('Average Score', fontsize=11)
@@ -108,11 +169,8 @@ for i, score in enumerate(avg_scores.values):
     ax3.text(i, score + 0.5, f'{score:.1f}', ha='center', fontsize=9)
 
 # 4. Funding trends (10 years)
-ax4 = fig.add_subplot(gs[2, 0])
-funding = df_all.groupby('Year').agg({
-    'Funding_Request': 'sum',
-    'Funding_Award': 'sum'
-}) / 1000000  # Convert to millions
+ax4 = fig.add_subplot(gs[2, 0], sharex=ax1)
+funding = yearly[['Funding_Request', 'Funding_Award']] / 1000000  # Convert to millions
 
 x = np.arange(len(funding))
 width = 0.35
@@ -120,8 +178,7 @@ ax4.bar(x - width/2, funding['Funding_Request'], width,
        label='Requested', color='steelblue', alpha=0.8)
 ax4.bar(x + width/2, funding['Funding_Award'], width, 
        label='Awarded', color='coral', alpha=0.8)
-ax4.set_xticks(x)
-ax4.set_xticklabels(funding.index, rotation=45)
+ax4.tick_params(axis='x', labelrotation=45)
 ax4.set_title('10-Year Funding Trends (Millions)', fontsize=13, fontweight='bold')
 ax4.set_xlabel('Year', fontsize=11)
 ax4.set_ylabel('Amount (Million $)', fontsize=11)
@@ -131,13 +188,18 @@ ax4.axvline(x=5.5, color='red', linestyle='--', linewidth=1.5, alpha=0.5)
 
 # 5. Priority distribution (10 years)
 ax5 = fig.add_subplot(gs[2, 1])
-priority_yearly = df_all.groupby(['Year', 'Priority_Category']).size().unstack(fill_value=0)
-
-main_priorities = ['ANGHP', 'EO', 'NI', 'HA']
-priority_yearly_main = priority_yearly[[p for p in main_priorities if p in priority_yearly.columns]]
-
-priority_yearly_main.plot(kind='area', stacked=True, ax=ax5, alpha=0.7,
-                         color=['#e74c3c', '#3498db', '#2ecc71', '#f39c12'])
+priority_by_period = (df_all.groupby(['Period', 'Year', 'Priority_Category'], observed=True, dropna=False)
+                      .size().unstack(fill_value=0))
+priority_yearly = priority_by_period.groupby(level='Year', sort=True).sum()
+
+main_priorities = PRIORITY_COLORS.index[PRIORITY_COLORS.index.isin(priority_yearly.columns)]
+priority_yearly_main = priority_yearly[main_priorities]
+
+# Stacked straight from the count matrix, on the same year positions as the other panels
+x5 = np.arange(len(priority_yearly_main))
+ax5.stackplot(x5, priority_yearly_main.to_numpy().T, labels=priority_yearly_main.columns,
+              colors=PRIORITY_COLORS[main_priorities].tolist(), alpha=0.7)
+ax5.set_xticks(x5)
 ax5.set_title('10-Year Priority Distribution', fontsize=13, fontweight='bold')
 ax5.set_xlabel('Year', fontsize=11)
 ax5.set_ylabel('Number of Applications', fontsize=11)
@@ -146,8 +208,15 @@ ax5.set_xticklabels(priority_yearly.index, rotation=45)
 ax5.grid(True, alpha=0.3, axis='y')
 ax5.axvline(x=5.5, color='red', linestyle='--', linewidth=1.5, alpha=0.5)
 
-plt.savefig(OUTPUT_DIR / 'stretch_10year_overview.png', dpi=300, bbox_inches='tight')
-print(f"✓ Saved: stretch_10year_overview.png")
+# pandas .plot() hides x labels on shared axes above the bottom row
+for ax in (ax1, ax3):
+    ax.tick_params(axis='x', labelbottom=True)
+    ax.xaxis.label.set_visible(True)
+
+# Spacing comes from the gridspec, so this figure still needs the tight bbox
+out = save_figure(fig, OUTPUT_DIR / 'stretch_10year_overview', bbox_inches='tight')
+plt.close(fig)
+print(f"✓ Saved: {out.name}")
 
 # ============================================================================
 # Period Comparison (2016-2022 vs 2022-2026)
@@ -156,29 +225,27 @@ print(f"\n{'='*70}")
 print("Generating Period Comparison")
 print(f"{'='*70}")
 
-df_old['Period'] = '2016-2022'
-df_new['Period'] = '2022-2026'
-df_comparison = pd.concat([df_old, df_new], ignore_index=True)
-
-# Calculate comparison statistics
-comparison_stats = df_comparison.groupby('Period').agg({
-    'Organization': 'count',
-    'Total_Score': 'mean',
-    'Funding_Request': 'mean',
-    'Funding_Award': 'mean'
-}).round(2)
-
-comparison_stats.columns = ['Total_Apps', 'Avg_Score', 'Avg_Request', 'Avg_Award']
+# Every period table is a roll-up of a per-(Period, Year) table built for the overview
+
+# Calculate comparison statistics by rolling the yearly totals up to periods
+period_totals = period_yearly.groupby(level='Period', observed=True).sum()
+period_means = pd.DataFrame({
+    'Total_Apps': period_totals['n'].astype(int),
+    'Avg_Score': period_totals['score_sum'] / period_totals['score_n'],
+    'Avg_Request': period_totals['Funding_Request'] / period_totals['request_n'],
+    'Avg_Award': period_totals['Funding_Award'] / period_totals['award_n'],
+})
+comparison_stats = period_means.round(2)
 print("\nPeriod Comparison:")
 print(comparison_stats)
 
 # By category
-period_by_type = df_comparison.groupby(['Period', 'App_Type']).size().unstack(fill_value=0)
+period_by_type = cat_by_period.groupby(level='Period', observed=True).sum()
 print("\nBy Category:")
 print(period_by_type)
 
 # By priority
-period_by_priority = df_comparison.groupby(['Period', 'Priority_Category']).size().unstack(fill_value=0)
+period_by_priority = priority_by_period.groupby(level='Period', observed=True).sum()
 print("\nBy Priority:")
 print(period_by_priority)
 
@@ -231,9 +298,9 @@ axes[1, 0].set_xticklabels(axes[1, 0].get_xticklabels(), rotation=45, ha='right'
 axes[1, 0].grid(True, alpha=0.3, axis='y')
 
 # 5. By priority
-main_priorities_comp = [p for p in ['ANGHP', 'EO', 'NI', 'HA'] if p in period_by_priority.columns]
+main_priorities_comp = PRIORITY_COLORS.index[PRIORITY_COLORS.index.isin(period_by_priority.columns)]
 period_by_priority[main_priorities_comp].plot(kind='bar', ax=axes[1, 1],
-                                              color=['#e74c3c', '#3498db', '#2ecc71', '#f39c12'])
+                                              color=PRIORITY_COLORS[main_priorities_comp].tolist())
 axes[1, 1].set_title('Comparison by Priority', fontsize=12, fontweight='bold')
 axes[1, 1].set_xlabel('Period')
 axes[1, 1].set_ylabel('Count')
@@ -242,19 +309,25 @@ axes[1, 1].set_xticklabels(axes[1, 1].get_xticklabels(), rotation=0)
 axes[1, 1].grid(True, alpha=0.3, axis='y')
 
 # 6. Top organizations
-top_orgs_old = df_old.groupby('Organization').size().nlargest(10)
+# Integer codes + bincount; sorted codes and a stable sort keep nlargest's tie order
+codes, orgs = pd.factorize(df_old['Organization'], sort=True)
+org_counts = np.bincount(codes[codes >= 0], minlength=len(orgs))
+top = np.argsort(-org_counts, kind='stable')[:10]
+top_orgs_old = pd.Series(org_counts[top], index=orgs[top])
 axes[1, 2].barh(range(len(top_orgs_old)), top_orgs_old.values, color='steelblue', alpha=0.7)
 axes[1, 2].set_yticks(range(len(top_orgs_old)))
-axes[1, 2].set_yticklabels([org[:25] + '...' if len(org) > 25 else org 
-                           for org in top_orgs_old.index], fontsize=8)
+orgs = top_orgs_old.index
+short_orgs = np.where(orgs.str.len() > 25, orgs.str[:25] + '...', orgs)
+axes[1, 2].set_yticklabels(short_orgs, fontsize=8)
 axes[1, 2].set_title('Top 10 Orgs (2016-2022)', fontsize=12, fontweight='bold')
 axes[1, 2].set_xlabel('Applications')
 axes[1, 2].invert_yaxis()
 axes[1, 2].grid(True, alpha=0.3, axis='x')
 
-plt.tight_layout()
-plt.savefig(OUTPUT_DIR / 'stretch_period_comparison.png', dpi=300, bbox_inches='tight')
-print(f"✓ Saved: stretch_period_comparison.png")
+fig.tight_layout()
+out = save_figure(fig, OUTPUT_DIR / 'stretch_period_comparison')
+plt.close(fig)
+print(f"✓ Saved: {out.name}")
 
 # ============================================================================
 # Summary Statistics
@@ -265,10 +338,10 @@ print(f"{'='*70}")
 
 # Calculate changes
 pct_changes = {
-    'Applications': (len(df_new) - len(df_old)) / len(df_old) * 100,
-    'Avg_Score': df_new['Total_Score'].mean() - df_old['Total_Score'].mean(),
-    'Avg_Request': (df_new['Funding_Request'].mean() - df_old['Funding_Request'].mean()) / df_old['Funding_Request'].mean() * 100,
-    'Avg_Award': (df_new['Funding_Award'].mean() - df_old['Funding_Award'].mean()) / df_old['Funding_Award'].mean() * 100
+    'Applications': period_means['Total_Apps'].pct_change().iloc[-1] * 100,
+    'Avg_Score': period_means['Avg_Score'].diff().iloc[-1],
+    'Avg_Request': period_means['Avg_Request'].pct_change().iloc[-1] * 100,
+    'Avg_Award': period_means['Avg_Award'].pct_change().iloc[-1] * 100
 }
 
 print(f"\nChanges from 2016-2022 to 2022-2026:")
@@ -281,6 +354,6 @@ print(f"\n{'='*70}")
 print("VISUALIZATION COMPLETE")
 print(f"{'='*70}")
 print(f"\nGenerated files:")
-print(f"  • stretch_10year_overview.png")
-print(f"  • stretch_period_comparison.png")
+print(f"  • stretch_10year_overview.{FIG_FORMAT}")
+print(f"  • stretch_period_comparison.{FIG_FORMAT}")
 print("="*70)